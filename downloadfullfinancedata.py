@@ -6,28 +6,127 @@ Supports Nifty 50, Sensex 30, and major indices with comprehensive error handlin
 
 Author: Market Data Analytics Team
 Version: 1.0.0
-Dependencies: yfinance, pandas
+Dependencies: yfinance, pandas, pyarrow (optional: aiohttp, curl_cffi)
 """
 
 import yfinance as yf
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
 import os
+import asyncio
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
-from typing import List, Dict, Tuple
+import logging.handlers
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+try:
+    import aiohttp
+except ImportError:  # Optional: only required for http_backend="aiohttp"
+    aiohttp = None
+
+try:
+    from curl_cffi import requests as curl_requests
+except ImportError:  # Installed with yfinance >= 0.2.54, which only accepts its sessions
+    curl_requests = None
 
 # Configure logging for production environment
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Buffer log file writes so records reach disk in batches rather than per line;
+# an ERROR record flushes the buffer immediately
+_log_file_handler = logging.FileHandler('stock_downloader.log')
+_log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('stock_downloader.log'),
+        logging.handlers.MemoryHandler(capacity=100, target=_log_file_handler),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Supported on-disk formats and their file extensions:
+#   csv     - portability, readable by any tool
+#   parquet - ecosystem support (Spark, DuckDB, Polars)
+#   feather - fastest local read/write for repeated analysis
+#   dataset - one Hive-partitioned Parquet dataset for all symbols
+OUTPUT_EXTENSIONS = {
+    'parquet': '.parquet',
+    'feather': '.feather',
+    'csv': '.csv.gz',
+    'dataset': '.parquet',
+}
+
+# OHLC price columns stored as float32 when downcasting is enabled
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+
+# Largest Volume value that can be stored losslessly as int32
+INT32_MAX = 2 ** 31 - 1
+
+# Relative Close difference on overlapping rows beyond which saved history is
+# treated as re-adjusted (split/dividend) rather than float32 rounding
+ADJUSTMENT_TOLERANCE = 1e-4
+
+# Nifty 50 constituent list is cached on disk for this many seconds
+NIFTY50_CACHE_TTL = 24 * 60 * 60
+
+# Yahoo Finance chart endpoint used by the aiohttp backend
+YAHOO_CHART_URL = 'https://query1.finance.yahoo.com/v8/finance/chart/{symbol}'
+
+# Maximum in-flight HTTP requests for the aiohttp backend
+ASYNC_MAX_IN_FLIGHT = 10
+
+# Major Indian market indices with their Yahoo Finance symbols
+MARKET_INDICES = {
+    '^NSEI': 'NIFTY50',        # Nifty 50 Index
+    '^BSESN': 'SENSEX',        # BSE Sensex Index
+    '^NSEBANK': 'BANKNIFTY'    # Bank Nifty Index
+}
+
+# Hardcoded fallback Nifty 50 constituents, deduplicated once at import.
+# This list should be periodically updated to reflect index changes.
+FALLBACK_NIFTY50: Tuple[str, ...] = tuple(dict.fromkeys((
+    'ADANIPORTS.NS', 'ASIANPAINT.NS', 'AXISBANK.NS', 'BAJAJ-AUTO.NS',
+    'BAJFINANCE.NS', 'BAJAJFINSV.NS', 'BPCL.NS', 'BHARTIARTL.NS',
+    'CIPLA.NS', 'COALINDIA.NS', 'DRREDDY.NS', 'EICHERMOT.NS',
+    'GRASIM.NS', 'HCLTECH.NS', 'HDFCBANK.NS', 'HDFCLIFE.NS',
+    'HEROMOTOCO.NS', 'HINDALCO.NS', 'HINDUNILVR.NS', 'ICICIBANK.NS',
+    'INDUSINDBK.NS', 'INFY.NS', 'ITC.NS', 'JSWSTEEL.NS',
+    'KOTAKBANK.NS', 'LT.NS', 'M&M.NS', 'MARUTI.NS', 'NESTLEIND.NS',
+    'NTPC.NS', 'ONGC.NS', 'POWERGRID.NS', 'RELIANCE.NS', 'SBIN.NS',
+    'SUNPHARMA.NS', 'TATAMOTORS.NS', 'TATASTEEL.NS', 'TCS.NS',
+    'TECHM.NS', 'TITAN.NS', 'ULTRACEMCO.NS', 'WIPRO.NS',
+    'ADANIENT.NS', 'APOLLOHOSP.NS', 'BRITANNIA.NS', 'DIVISLAB.NS',
+    'HDFCLIFE.NS', 'LTIM.NS', 'SBILIFE.NS', 'TATACONSUM.NS'
+)))
+
+# Sensex 30 constituents for the BSE exchange
+SENSEX30_CONSTITUENTS: Tuple[str, ...] = tuple(dict.fromkeys((
+    'RELIANCE.BO', 'TCS.BO', 'HDFCBANK.BO', 'INFY.BO', 'ICICIBANK.BO',
+    'HINDUNILVR.BO', 'ITC.BO', 'SBIN.BO', 'BHARTIARTL.BO', 'BAJFINANCE.BO',
+    'KOTAKBANK.BO', 'LT.BO', 'AXISBANK.BO', 'ASIANPAINT.BO', 'MARUTI.BO',
+    'SUNPHARMA.BO', 'TITAN.BO', 'ULTRACEMCO.BO', 'NESTLEIND.BO',
+    'TATAMOTORS.BO', 'M&M.BO', 'HCLTECH.BO', 'POWERGRID.BO', 'NTPC.BO',
+    'WIPRO.BO', 'TATASTEEL.BO', 'BAJAJFINSV.BO', 'TECHM.BO',
+    'INDUSINDBK.BO', 'JSWSTEEL.BO'
+)))
+
+
+class StaleHistoryError(Exception):
+    """Saved history cannot be extended and has to be replaced by a full-range download."""
+
 
 class StockDataDownloader:
     """
@@ -35,16 +134,69 @@ class StockDataDownloader:
     Implements rate limiting and retry logic for robust data acquisition.
     """
     
-    def __init__(self, base_path: str = "data"):
+    def __init__(self, base_path: str = "data", max_workers: int = 8,
+                 output_format: str = "parquet", max_rps: int = 5,
+                 columns: Optional[Tuple[str, ...]] = None,
+                 http_backend: str = "yfinance", downcast: bool = True):
         """
         Initialize the downloader with directory structure.
         
         Args:
             base_path: Root directory for storing downloaded data
+            max_workers: Maximum number of concurrent per-symbol downloads
+            output_format: On-disk format for saved data ('parquet', 'feather', 'csv'
+                           or 'dataset')
+            max_rps: Maximum yfinance/chart calls started per second; a batched
+                     yf.download call counts once, however many symbols it covers
+            columns: OHLCV columns to keep when saving (e.g., ('Close',)); None keeps all
+            http_backend: 'yfinance' for batched yf.download calls, or 'aiohttp'
+                          to fetch every symbol concurrently on one asyncio event loop
+            downcast: Store OHLC prices as float32 and Volume as int32 to halve file size
         """
+        if output_format not in OUTPUT_EXTENSIONS:
+            raise ValueError(
+                f"Unsupported output_format '{output_format}'. "
+                f"Choose from: {', '.join(OUTPUT_EXTENSIONS)}"
+            )
+        if http_backend not in ('yfinance', 'aiohttp'):
+            raise ValueError(
+                f"Unsupported http_backend '{http_backend}'. Choose from: yfinance, aiohttp"
+            )
+        if http_backend == 'aiohttp' and aiohttp is None:
+            raise ImportError("http_backend='aiohttp' requires aiohttp: pip install aiohttp")
+        if max_rps < 1:
+            raise ValueError(f"max_rps must be at least 1, got {max_rps}")
+        
         self.base_path = base_path
+        self.max_workers = max_workers
+        self.output_format = output_format
+        self.max_rps = max_rps
+        self.columns = columns
+        self.http_backend = http_backend
+        self.downcast = downcast
+        
+        # Token bucket: timestamps of requests issued within the last second
+        self._bucket = deque()
+        self._bucket_lock = threading.Lock()
+        
+        # Shared connection-pooled session so TLS connections and the Yahoo
+        # cookie/crumb are reused across every download in this run
+        self._session = self._build_session()
+        self._session_warmed = False
+        self._session_lock = threading.Lock()
+        
         self.nifty_path = os.path.join(base_path, "nifty50")
         self.sensex_path = os.path.join(base_path, "sensex30")
+        self.dataset_path = os.path.join(base_path, "dataset")
+        
+        # Pre-computed output path pieces, reused for every file written
+        self._ext = OUTPUT_EXTENSIONS[output_format]
+        self._base_prefix = self.base_path + os.sep
+        self._nifty_prefix = os.path.normpath(self.nifty_path) + os.sep
+        self._sensex_prefix = os.path.normpath(self.sensex_path) + os.sep
+        
+        # Directories holding a single exchange, where its suffix is dropped from file names
+        self._exchange_prefixes = {'.NS': self._nifty_prefix, '.BO': self._sensex_prefix}
         
         # Create directory structure if it doesn't exist
         self._setup_directories()
@@ -54,69 +206,124 @@ class StockDataDownloader:
         directories = [self.base_path, self.nifty_path, self.sensex_path]
         for directory in directories:
             os.makedirs(directory, exist_ok=True)
-        logger.info(f"Directory structure initialized at: {self.base_path}")
+        logger.info("Directory structure initialized at: %s", self.base_path)
+    
+    def _throttle(self) -> None:
+        """
+        Block until a call slot is available under the max_rps limit.
+        Each yf.download, probe or aiohttp chart request takes one slot; the
+        per-ticker HTTP requests yfinance issues inside a batched call are not
+        counted individually. Allows bursts of up to max_rps calls and only
+        sleeps once the bucket is full, so it is safe to call from concurrent workers.
+        """
+        with self._bucket_lock:
+            now = time.monotonic()
+            
+            # Drop requests that have aged out of the one-second window
+            while self._bucket and now - self._bucket[0] >= 1.0:
+                self._bucket.popleft()
+            
+            if len(self._bucket) >= self.max_rps:
+                time.sleep(1.0 - (now - self._bucket[0]))
+                self._bucket.popleft()
+            
+            self._bucket.append(time.monotonic())
+    
+    def _build_session(self):
+        """
+        Create the shared HTTP session in the flavour the installed yfinance accepts.
+        Recent yfinance requires a curl_cffi session, which keeps connections
+        alive through libcurl; older releases take a pooled requests session.
+        
+        Returns:
+            curl_cffi or requests session to pass to yfinance
+        """
+        if curl_requests is not None:
+            return curl_requests.Session(impersonate="chrome")
+        
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        ))
+        return session
+    
+    def _warm_session(self) -> None:
+        """
+        Populate the shared session's Yahoo cookie/crumb with one cheap request.
+        If yfinance rejects the session, downloads fall back to its own default.
+        """
+        with self._session_lock:
+            if self._session_warmed:
+                return
+            self._session_warmed = True
+            
+            try:
+                self._throttle()
+                yf.Ticker('^NSEI', session=self._session).history(period="1d")
+            except Exception as e:
+                logger.warning("Shared HTTP session unavailable: %s. Using yfinance default.", e)
+                self._session = None
     
-    def get_nifty50_stocks(self) -> List[str]:
+    def get_nifty50_stocks(self) -> Sequence[str]:
         """
         Fetch the current list of Nifty 50 constituent stocks from NSE.
-        Falls back to hardcoded list if API call fails.
+        The list is cached on disk for 24 hours to skip the HTTP round-trip on
+        repeated runs. Falls back to hardcoded list if API call fails.
         
         Returns:
-            List of stock symbols with .NS suffix for NSE exchange
+            Sequence of stock symbols with .NS suffix for NSE exchange
         """
+        cache_path = os.path.join(self.base_path, ".nifty50_cache.parquet")
+        
+        # Serve from on-disk cache while it is fresh
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) > time.time() - NIFTY50_CACHE_TTL:
+            try:
+                df = pd.read_parquet(cache_path)
+                symbols = (df['Symbol'].astype('string') + '.NS').tolist()
+                logger.info("Loaded %d Nifty 50 stocks from cache", len(symbols))
+                return symbols
+            except Exception as e:
+                logger.warning("Failed to read Nifty 50 cache: %s. Refetching from NSE.", e)
+        
         try:
-            # Attempt to fetch live data from NSE official source
+            # Attempt to fetch live data from NSE official source (Symbol column only)
             nse_url = 'https://www.nseindia.com/content/indices/ind_nifty50list.csv'
-            df = pd.read_csv(nse_url)
-            symbols = [f"{symbol}.NS" for symbol in df['Symbol'].tolist()]
-            logger.info(f"Successfully fetched {len(symbols)} Nifty 50 stocks from NSE")
-            return symbols
+            df = pd.read_csv(nse_url, usecols=["Symbol"], dtype={"Symbol": "string"})
+            symbols = (df['Symbol'].astype('string') + '.NS').tolist()
+            logger.info("Successfully fetched %d Nifty 50 stocks from NSE", len(symbols))
         except Exception as e:
             # Fallback to static list if API fails
-            logger.warning(f"Failed to fetch live Nifty 50 list: {e}. Using fallback list.")
+            logger.warning("Failed to fetch live Nifty 50 list: %s. Using fallback list.", e)
             return self._get_fallback_nifty50()
+        
+        try:
+            df.to_parquet(cache_path, index=False)
+        except Exception as e:
+            logger.warning("Failed to write Nifty 50 cache: %s", e)
+        
+        return symbols
     
-    def _get_fallback_nifty50(self) -> List[str]:
+    def _get_fallback_nifty50(self) -> Tuple[str, ...]:
         """
         Provides a hardcoded fallback list of Nifty 50 constituents.
         This list should be periodically updated to reflect index changes.
         
         Returns:
-            Static list of Nifty 50 stock symbols
-        """
-        return [
-            'ADANIPORTS.NS', 'ASIANPAINT.NS', 'AXISBANK.NS', 'BAJAJ-AUTO.NS',
-            'BAJFINANCE.NS', 'BAJAJFINSV.NS', 'BPCL.NS', 'BHARTIARTL.NS',
-            'CIPLA.NS', 'COALINDIA.NS', 'DRREDDY.NS', 'EICHERMOT.NS',
-            'GRASIM.NS', 'HCLTECH.NS', 'HDFCBANK.NS', 'HDFCLIFE.NS',
-            'HEROMOTOCO.NS', 'HINDALCO.NS', 'HINDUNILVR.NS', 'ICICIBANK.NS',
-            'INDUSINDBK.NS', 'INFY.NS', 'ITC.NS', 'JSWSTEEL.NS',
-            'KOTAKBANK.NS', 'LT.NS', 'M&M.NS', 'MARUTI.NS', 'NESTLEIND.NS',
-            'NTPC.NS', 'ONGC.NS', 'POWERGRID.NS', 'RELIANCE.NS', 'SBIN.NS',
-            'SUNPHARMA.NS', 'TATAMOTORS.NS', 'TATASTEEL.NS', 'TCS.NS',
-            'TECHM.NS', 'TITAN.NS', 'ULTRACEMCO.NS', 'WIPRO.NS',
-            'ADANIENT.NS', 'APOLLOHOSP.NS', 'BRITANNIA.NS', 'DIVISLAB.NS',
-            'HDFCLIFE.NS', 'LTIM.NS', 'SBILIFE.NS', 'TATACONSUM.NS'
-        ]
-    
-    def get_sensex30_stocks(self) -> List[str]:
+            Static tuple of Nifty 50 stock symbols
+        """
+        return FALLBACK_NIFTY50
+    
+    def get_sensex30_stocks(self) -> Tuple[str, ...]:
         """
         Get the list of Sensex 30 constituent stocks for BSE exchange.
         
         Returns:
-            List of stock symbols with .BO suffix for BSE exchange
-        """
-        sensex_constituents = [
-            'RELIANCE.BO', 'TCS.BO', 'HDFCBANK.BO', 'INFY.BO', 'ICICIBANK.BO',
-            'HINDUNILVR.BO', 'ITC.BO', 'SBIN.BO', 'BHARTIARTL.BO', 'BAJFINANCE.BO',
-            'KOTAKBANK.BO', 'LT.BO', 'AXISBANK.BO', 'ASIANPAINT.BO', 'MARUTI.BO',
-            'SUNPHARMA.BO', 'TITAN.BO', 'ULTRACEMCO.BO', 'NESTLEIND.BO',
-            'TATAMOTORS.BO', 'M&M.BO', 'HCLTECH.BO', 'POWERGRID.BO', 'NTPC.BO',
-            'WIPRO.BO', 'TATASTEEL.BO', 'BAJAJFINSV.BO', 'TECHM.BO',
-            'INDUSINDBK.BO', 'JSWSTEEL.BO'
-        ]
-        logger.info(f"Loaded {len(sensex_constituents)} Sensex 30 stocks")
-        return sensex_constituents
+            Tuple of stock symbols with .BO suffix for BSE exchange
+        """
+        logger.info("Loaded %d Sensex 30 stocks", len(SENSEX30_CONSTITUENTS))
+        return SENSEX30_CONSTITUENTS
     
     def download_single_stock(self, symbol: str, start_date: datetime, 
                              end_date: datetime, save_path: str) -> bool:
@@ -127,107 +334,821 @@ class StockDataDownloader:
             symbol: Stock ticker symbol (e.g., 'RELIANCE.NS')
             start_date: Start date for historical data
             end_date: End date for historical data
-            save_path: Directory path to save the CSV file
+            save_path: Directory path to save the output file
+            
+        Returns:
+            True if download successful, False otherwise
+        """
+        return self._download_single(symbol, start_date, end_date,
+                                     os.path.normpath(save_path) + os.sep)
+    
+    def _download_single(self, symbol: str, start_date: datetime, end_date: datetime,
+                         prefix: str, replace: bool = False) -> bool:
+        """
+        Download and save a single stock symbol under an output path prefix.
+        
+        Args:
+            symbol: Stock ticker symbol (e.g., 'RELIANCE.NS')
+            start_date: Start date for historical data
+            end_date: End date for historical data
+            prefix: Output directory including the trailing path separator
+            replace: Download the whole range and overwrite any saved history
             
         Returns:
             True if download successful, False otherwise
         """
         try:
-            logger.info(f"Downloading data for {symbol}")
+            resume = start_date if replace else self._resume_start(
+                self._output_filename(symbol, prefix), start_date, end_date
+            )
+            if resume is None:
+                logger.info("%s is up-to-date, skipping", symbol)
+                return True
+            
+            # Reject delisted or mistyped symbols before the multi-year download;
+            # a replacement only follows a download that already returned rows
+            self._warm_session()
+            if not replace and not self._probe_symbol(symbol):
+                return False
+            
+            logger.info("Downloading data for %s", symbol)
             
             # Fetch data from Yahoo Finance API
+            self._throttle()
             data = yf.download(
                 symbol, 
-                start=start_date, 
+                start=resume, 
                 end=end_date, 
                 progress=False,
-                auto_adjust=True  # Adjust for splits and dividends
+                auto_adjust=True,  # Adjust for splits and dividends
+                session=self._session
             )
             
             if not data.empty:
-                # Clean symbol name for filename (remove exchange suffix)
-                clean_symbol = symbol.replace('.NS', '').replace('.BO', '')
-                filename = os.path.join(save_path, f"{clean_symbol}.csv")
-                
-                # Save to CSV with proper formatting
-                data.to_csv(filename)
-                logger.info(f"Successfully saved: {filename} ({len(data)} rows)")
-                return True
+                data = self._flatten_columns(data)
+                try:
+                    return self._save_data(data, symbol, prefix, replace)
+                except StaleHistoryError as e:
+                    logger.warning("Cannot extend saved history for %s: %s. Replacing it.", symbol, e)
+                    if resume == start_date:
+                        return self._save_data(data, symbol, prefix, replace=True)
+                    return self._download_single(symbol, start_date, end_date, prefix, replace=True)
             else:
-                logger.warning(f"No data available for {symbol}")
+                logger.warning("No data available for %s", symbol)
                 return False
                 
         except Exception as e:
-            logger.error(f"Failed to download {symbol}: {str(e)}")
+            logger.error("Failed to download %s: %s", symbol, e)
             return False
     
-    def bulk_download_stocks(self, stock_list: List[str], save_path: str, 
+    def _probe_symbol(self, symbol: str) -> bool:
+        """
+        Check that a symbol is live with one small chart request for the last
+        five days, instead of fast_info, which fetches a full year of history.
+        Not used on the batched path, where each extra symbol is already cheap.
+        
+        Args:
+            symbol: Stock ticker symbol (e.g., 'RELIANCE.NS')
+            
+        Returns:
+            True if Yahoo Finance returns recent prices for the symbol, False otherwise
+        """
+        try:
+            self._throttle()
+            recent = yf.Ticker(symbol, session=self._session).history(period="5d")
+        except Exception as e:
+            logger.warning("No recent prices for %s: %s. Skipping download.", symbol, e)
+            return False
+        
+        if recent.empty or recent['Close'].isna().all():
+            logger.warning("No recent prices for %s. Skipping download.", symbol)
+            return False
+        
+        return True
+    
+    def _write_frame(self, data: pd.DataFrame, filename: str) -> None:
+        """
+        Write a DataFrame to disk in the configured output format.
+        
+        Args:
+            data: DataFrame to write
+            filename: Output path including the format's file extension
+        """
+        if self.output_format == 'parquet':
+            # Write through pyarrow directly; statistics are skipped as per-ticker
+            # files are small and always read in full
+            table = pa.Table.from_pandas(data, preserve_index=True)
+            pq.write_table(table, filename, compression="snappy",
+                           use_dictionary=True, write_statistics=False)
+        elif self.output_format == 'feather':
+            # Feather cannot store a non-default index, so keep Date as a column
+            data.reset_index().to_feather(filename, compression="zstd", compression_level=3)
+        else:
+            # Default gzip level is the write bottleneck; level 1 is far faster
+            data.to_csv(filename, compression={"method": "gzip", "compresslevel": 1})
+    
+    def bulk_download_stocks(self, stock_list: Sequence[str], save_path: str, 
                             start_date: datetime, end_date: datetime) -> Tuple[int, int]:
         """
-        Download historical data for multiple stocks with rate limiting.
+        Download historical data for multiple stocks in a single batched request.
+        
+        All symbols are fetched with one multi-ticker yf.download call; any symbol
+        missing from the batch response is retried via download_single_stock.
         
         Args:
             stock_list: List of stock symbols to download
-            save_path: Directory to save CSV files
+            save_path: Directory to save output files
             start_date: Start date for historical data
             end_date: End date for historical data
             
         Returns:
             Tuple of (successful_downloads, total_stocks)
         """
-        success_count = 0
+        stock_list = list(dict.fromkeys(stock_list))
         total_stocks = len(stock_list)
         
-        logger.info(f"Starting bulk download of {total_stocks} stocks")
+        logger.info("Starting bulk download of %d stocks", total_stocks)
+        
+        prefix = os.path.normpath(save_path) + os.sep
+        results = self._download_batch(stock_list, start_date, end_date, lambda symbol: prefix)
+        success_count = sum(results.values())
+        
+        logger.info("Bulk download complete: %d/%d successful", success_count, total_stocks)
+        return success_count, total_stocks
+    
+    def _download_batch(self, symbols: Sequence[str], start_date: datetime, end_date: datetime,
+                        path_for: Callable[[str], str]) -> Dict[str, bool]:
+        """
+        Fetch many symbols with multi-ticker yf.download calls and save each.
+        
+        Symbols already saved up to end_date are skipped. The rest are grouped
+        by the date their download resumes from, with one batched request per
+        group, so a symbol without a file never forces a full-range re-download
+        of symbols that only need a few days. A symbol whose output file is
+        already taken by an earlier symbol in the list is rejected.
+        
+        Args:
+            symbols: Stock or index symbols to download
+            start_date: Start date for historical data
+            end_date: End date for historical data
+            path_for: Maps a symbol to its output prefix (directory plus separator)
+            
+        Returns:
+            Dictionary mapping each symbol to whether it was saved
+        """
+        symbols = list(dict.fromkeys(symbols))
+        results = {}
         
-        for idx, stock in enumerate(stock_list, 1):
-            logger.info(f"Processing {idx}/{total_stocks}: {stock}")
+        # Skip symbols already saved up to end_date; group the rest by resume date
+        pending = {}
+        owners = {}
+        for symbol in symbols:
+            filename = self._output_filename(symbol, path_for(symbol))
             
-            if self.download_single_stock(stock, start_date, end_date, save_path):
-                success_count += 1
+            # Two symbols with one output file (e.g. TCS and TCS.NS in nifty50/)
+            # would overwrite each other from concurrent save or retry workers
+            if filename in owners:
+                logger.error("%s maps to %s, already used by %s. Skipping.",
+                             symbol, filename, owners[filename])
+                results[symbol] = False
+                continue
+            owners[filename] = symbol
             
-            # Rate limiting: Add delay between requests to avoid API throttling
-            time.sleep(0.5)
+            resume = self._resume_start(filename, start_date, end_date)
+            if resume is None:
+                logger.info("%s is up-to-date, skipping", symbol)
+                results[symbol] = True
+                continue
+            pending.setdefault(resume, []).append(symbol)
         
-        logger.info(f"Bulk download complete: {success_count}/{total_stocks} successful")
-        return success_count, total_stocks
+        for resume, group in pending.items():
+            results.update(self._fetch_batch(group, resume, end_date, path_for, start_date))
+        
+        return results
     
-    def download_market_indices(self, start_date: datetime, end_date: datetime) -> None:
+    def _fetch_batch(self, symbols: List[str], start_date: datetime, end_date: datetime,
+                     path_for: Callable[[str], str], full_start: datetime,
+                     replace: bool = False) -> Dict[str, bool]:
         """
-        Download historical data for major Indian market indices.
+        Download one group of symbols sharing a start date in a single request.
+        
+        Symbols missing from the batch response are retried individually on a
+        thread pool. Resumed symbols whose saved history no longer lines up with
+        the new rows are re-downloaded from full_start in one more batch and
+        their files replaced.
+        
+        Args:
+            symbols: Stock or index symbols to download
+            start_date: Start date for historical data
+            end_date: End date for historical data
+            path_for: Maps a symbol to its output prefix (directory plus separator)
+            full_start: Start of the full requested range, used when saved history
+                        has to be replaced
+            replace: Overwrite previously saved history instead of merging with it
+            
+        Returns:
+            Dictionary mapping each symbol to whether it was saved
+        """
+        results = {}
+        missing = []
+        frames = {}
+        if self.http_backend == 'aiohttp':
+            # The chart endpoint is the only source here, so there is no per-symbol retry
+            frames = asyncio.run(self._async_download_batch(symbols, start_date, end_date))
+            results.update((symbol, False) for symbol in symbols if symbol not in frames)
+        else:
+            try:
+                # One multi-symbol request; yfinance fans out per-ticker parsing on threads
+                self._warm_session()
+                self._throttle()
+                data = yf.download(
+                    " ".join(symbols),
+                    start=start_date,
+                    end=end_date,
+                    group_by="ticker",
+                    threads=min(len(symbols), 10),
+                    progress=False,
+                    auto_adjust=True,  # Adjust for splits and dividends
+                    session=self._session
+                )
+            except Exception as e:
+                logger.error("Batch download failed: %s. Falling back to per-symbol downloads.", e)
+                data = pd.DataFrame()
+            
+            for idx, symbol in enumerate(symbols, 1):
+                logger.debug("Processing %d/%d: %s", idx, len(symbols), symbol)
+                
+                sub = self._extract_symbol(data, symbol, len(symbols))
+                if sub is None or sub.empty:
+                    missing.append(symbol)
+                    continue
+                
+                frames[symbol] = sub
+        
+        saved, stale = self._save_frames(frames, path_for, replace)
+        results.update(saved)
+        
+        if stale:
+            if start_date == full_start:
+                # Already the full range, so it can replace the saved history as it is
+                saved, _ = self._save_frames({s: frames[s] for s in stale}, path_for, replace=True)
+                results.update(saved)
+            else:
+                results.update(self._fetch_batch(stale, full_start, end_date, path_for,
+                                                 full_start, replace=True))
+        
+        # Retry symbols absent from the batch response concurrently
+        if missing:
+            logger.warning("%d symbols missing from batch response, retrying individually", len(missing))
+            with ThreadPoolExecutor(max_workers=min(len(missing), self.max_workers)) as executor:
+                futures = {
+                    executor.submit(self._download_fallback, s, start_date, end_date, path_for(s), replace): s
+                    for s in missing
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        
+        return results
+    
+    async def _async_download_batch(self, symbols: List[str], start_date: datetime,
+                                    end_date: datetime) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch many symbols concurrently with aiohttp on a single event loop.
         
         Args:
+            symbols: Stock or index symbols to download
             start_date: Start date for historical data
             end_date: End date for historical data
+            
+        Returns:
+            Downloaded historical data keyed by symbol; symbols without data are omitted
         """
-        # Define major indices with their Yahoo Finance symbols
-        indices_config = {
-            '^NSEI': 'NIFTY50',        # Nifty 50 Index
-            '^BSESN': 'SENSEX',        # BSE Sensex Index
-            '^NSEBANK': 'BANKNIFTY'    # Bank Nifty Index
+        semaphore = asyncio.Semaphore(ASYNC_MAX_IN_FLIGHT)
+        params = {
+            'period1': str(int(start_date.timestamp())),
+            'period2': str(int(end_date.timestamp())),
+            'interval': '1d',
+            'events': 'history',
+            'includeAdjustedClose': 'true',
         }
         
-        logger.info("Starting download of market indices")
+        # Yahoo rejects requests without a browser-like User-Agent
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        async with aiohttp.ClientSession(headers=headers) as session:
+            frames = await asyncio.gather(*[
+                self._async_fetch(session, semaphore, symbol, params) for symbol in symbols
+            ])
+        
+        downloaded = {}
+        for symbol, data in zip(symbols, frames):
+            if data is None or data.empty:
+                logger.warning("No data available for %s", symbol)
+            else:
+                downloaded[symbol] = data
         
-        for symbol, name in indices_config.items():
+        return downloaded
+    
+    async def _async_fetch(self, session: "aiohttp.ClientSession", semaphore: asyncio.Semaphore,
+                           symbol: str, params: Dict[str, str]) -> Optional[pd.DataFrame]:
+        """
+        Fetch daily history for one symbol from the Yahoo Finance chart endpoint.
+        
+        Args:
+            session: Shared aiohttp client session
+            semaphore: Limits the number of in-flight requests
+            symbol: Stock or index symbol to download
+            params: Query parameters for the chart endpoint
+            
+        Returns:
+            Split/dividend adjusted OHLCV DataFrame, or None on failure
+        """
+        async with semaphore:
+            # The token bucket sleeps, so wait for it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self._throttle)
+            
             try:
-                logger.info(f"Downloading {name} index data")
-                data = yf.download(symbol, start=start_date, end=end_date, progress=False)
+                logger.info("Downloading data for %s", symbol)
+                url = YAHOO_CHART_URL.format(symbol=quote(symbol, safe=''))
+                async with session.get(url, params=params) as response:
+                    response.raise_for_status()
+                    payload = await response.json()
+                return self._parse_chart(payload)
                 
-                if not data.empty:
-                    filename = os.path.join(self.base_path, f"{name}_index.csv")
-                    data.to_csv(filename)
-                    logger.info(f"Index saved: {filename} ({len(data)} rows)")
-                else:
-                    logger.warning(f"No data available for {name}")
-                    
             except Exception as e:
-                logger.error(f"Failed to download {name} index: {str(e)}")
+                logger.error("Failed to download %s: %s", symbol, e)
+                return None
+    
+    def _parse_chart(self, payload: Dict) -> pd.DataFrame:
+        """
+        Convert a Yahoo Finance chart response into an adjusted OHLCV DataFrame.
+        Prices are scaled by Adj Close / Close to match yf.download(auto_adjust=True).
+        
+        Args:
+            payload: Decoded JSON body of a chart endpoint response
+            
+        Returns:
+            DataFrame indexed by Date with Open, High, Low, Close, Volume columns
+        """
+        result = payload['chart']['result'][0]
+        if not result.get('timestamp'):
+            return pd.DataFrame()
+        
+        quote_data = result['indicators']['quote'][0]
+        dates = (
+            pd.to_datetime(result['timestamp'], unit='s', utc=True)
+            .tz_convert(result['meta']['exchangeTimezoneName'])
+            .tz_localize(None)
+            .normalize()
+        )
+        data = pd.DataFrame(
+            {column: quote_data[column.lower()] for column in ('Open', 'High', 'Low', 'Close', 'Volume')},
+            index=pd.DatetimeIndex(dates, name='Date'),
+            dtype='float64'
+        )
+        
+        # Adjust prices for splits and dividends
+        adjclose = result['indicators'].get('adjclose')
+        if adjclose:
+            ratio = pd.Series(adjclose[0]['adjclose'], index=data.index, dtype='float64') / data['Close']
+            for column in ('Open', 'High', 'Low', 'Close'):
+                data[column] = data[column] * ratio
+        
+        return data.dropna(how="all")
+    
+    def _download_fallback(self, symbol: str, start_date: datetime, end_date: datetime,
+                           prefix: str, replace: bool = False) -> bool:
+        """
+        Download a single symbol outside of a batch, dispatching on its type.
+        
+        Args:
+            symbol: Stock or index symbol to download
+            start_date: Start date for historical data
+            end_date: End date for historical data
+            prefix: Output directory including the trailing path separator
+            replace: Download the whole range and overwrite any saved history
+            
+        Returns:
+            True if download successful, False otherwise
+        """
+        if symbol in MARKET_INDICES:
+            return self._download_index(symbol, MARKET_INDICES[symbol], start_date, end_date, replace)
+        return self._download_single(symbol, start_date, end_date, prefix, replace)
+    
+    def _route_prefix(self, symbol: str) -> str:
+        """
+        Resolve the output prefix for a symbol from its prefix or exchange suffix.
+        
+        Args:
+            symbol: Stock or index symbol (e.g., '^NSEI', 'TCS.NS', 'TCS.BO')
+            
+        Returns:
+            Output directory, including the trailing separator, for the symbol
+        """
+        if symbol.startswith('^'):
+            return self._base_prefix
+        if symbol.endswith('.BO'):
+            return self._sensex_prefix
+        return self._nifty_prefix
+    
+    def _flatten_columns(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop the Ticker column level that newer yfinance versions add to
+        single-ticker downloads, so files match the flat batch schema.
+        
+        Args:
+            data: DataFrame returned by a single-symbol yf.download call
+            
+        Returns:
+            DataFrame with flat OHLCV column names
+        """
+        if isinstance(data.columns, pd.MultiIndex):
+            level = 'Ticker' if 'Ticker' in data.columns.names else -1
+            data = data.droplevel(level, axis=1)
+        return data
+    
+    def _extract_symbol(self, data: pd.DataFrame, symbol: str,
+                        batch_size: int) -> Optional[pd.DataFrame]:
+        """
+        Extract a single symbol's OHLCV frame from a batched yf.download result.
+        
+        Args:
+            data: DataFrame returned by a multi-symbol yf.download call
+            symbol: Stock ticker symbol to extract
+            batch_size: Number of symbols requested in the batch
+            
+        Returns:
+            DataFrame for the symbol with all-NaN rows dropped, or None if absent
+        """
+        if data.empty:
+            return None
+        
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                return None
+            sub = data[symbol]
+        elif batch_size == 1:
+            # Older yfinance versions return flat columns for a single ticker
+            sub = data
+        else:
+            return None
+        
+        return sub.dropna(how="all")
+    
+    def _save_frames(self, frames: Dict[str, pd.DataFrame], path_for: Callable[[str], str],
+                     replace: bool = False) -> Tuple[Dict[str, bool], List[str]]:
+        """
+        Persist the frames of a batch concurrently, or as one dataset write in 'dataset' mode.
+        
+        Args:
+            frames: Downloaded historical data keyed by symbol
+            path_for: Maps a symbol to its output prefix (directory plus separator)
+            replace: Overwrite previously saved history instead of merging with it
+            
+        Returns:
+            Tuple of (symbol to whether it was saved, symbols left unsaved because
+            their saved history has to be replaced)
+        """
+        if self.output_format != 'dataset':
+            if not frames:
+                return {}, []
+            
+            # Serialization, compression and file IO release the GIL, so writing
+            # files on a pool overlaps them instead of blocking on each in turn.
+            # _download_batch guarantees every symbol here has its own file.
+            results, stale = {}, []
+            with ThreadPoolExecutor(max_workers=min(len(frames), self.max_workers)) as executor:
+                futures = {
+                    executor.submit(self._save_data, data, symbol, path_for(symbol), replace): symbol
+                    for symbol, data in frames.items()
+                }
+                for future in as_completed(futures):
+                    symbol = futures[future]
+                    try:
+                        results[symbol] = future.result()
+                    except StaleHistoryError as e:
+                        logger.warning("Cannot extend saved history for %s: %s. Replacing it.", symbol, e)
+                        stale.append(symbol)
+            return results, stale
+        
+        results, stale = {}, []
+        prepared = {}
+        for symbol, data in frames.items():
+            try:
+                prepared[symbol] = self._prepare_frame(
+                    data, self._output_filename(symbol, path_for(symbol)), replace
+                )
+            except StaleHistoryError as e:
+                logger.warning("Cannot extend saved history for %s: %s. Replacing it.", symbol, e)
+                stale.append(symbol)
+            except Exception as e:
+                logger.error("Failed to save %s: %s", symbol, e)
+                results[symbol] = False
+        
+        if not prepared:
+            return results, stale
+        
+        try:
+            self._write_dataset(prepared)
+            logger.info("Successfully saved %d symbols to dataset: %s", len(prepared), self.dataset_path)
+            results.update(dict.fromkeys(prepared, True))
+        except Exception as e:
+            logger.error("Failed to write dataset %s: %s", self.dataset_path, e)
+            results.update(dict.fromkeys(prepared, False))
+        
+        return results, stale
+    
+    def _save_data(self, data: pd.DataFrame, symbol: str, prefix: str,
+                   replace: bool = False) -> bool:
+        """
+        Persist a downloaded OHLCV frame for a stock or index symbol.
+        
+        Args:
+            data: Historical data for the symbol
+            symbol: Stock ticker symbol (e.g., 'RELIANCE.NS') or index symbol
+            prefix: Output directory including the trailing path separator
+            replace: Overwrite previously saved history instead of merging with it
+            
+        Returns:
+            True if the file was written, False otherwise
+            
+        Raises:
+            StaleHistoryError: If the saved history has to be replaced; the file
+                               is left untouched
+        """
+        try:
+            filename = self._output_filename(symbol, prefix)
+            data = self._prepare_frame(data, filename, replace)
+            
+            if self.output_format == 'dataset':
+                self._write_dataset({symbol: data})
+            else:
+                self._write_frame(data, filename)
+            logger.info("Successfully saved: %s (%d rows)", filename, len(data))
+            return True
+            
+        except StaleHistoryError:
+            raise
+        except Exception as e:
+            logger.error("Failed to save %s: %s", symbol, e)
+            return False
+    
+    def _prepare_frame(self, data: pd.DataFrame, filename: str,
+                       replace: bool = False) -> pd.DataFrame:
+        """
+        Apply the column projection and merge with any previously saved history.
+        
+        Args:
+            data: Newly downloaded historical data
+            filename: Output path the data will be written to
+            replace: Discard previously saved history instead of merging with it
+            
+        Returns:
+            DataFrame ready to be written
+            
+        Raises:
+            StaleHistoryError: If the saved history cannot be read or was adjusted
+                               differently from the new download
+        """
+        # Project to the requested columns before serialization
+        if self.columns is not None:
+            data = data[list(self.columns)]
+        
+        # Append to previously saved history, preferring freshly downloaded rows
+        if not replace and os.path.exists(filename):
+            try:
+                existing = self._read_frame(filename, columns=self.columns and list(self.columns))
+            except Exception as e:
+                raise StaleHistoryError(f"failed to read {filename}: {e}") from e
+            
+            self._check_adjustment(existing, data)
+            data = pd.concat([existing, data])
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+        
+        if self.downcast:
+            data = self._downcast(data)
+        
+        return data
+    
+    def _check_adjustment(self, existing: pd.DataFrame, data: pd.DataFrame) -> None:
+        """
+        Compare the rows a resumed download shares with the saved history. A split or
+        dividend since the last run re-adjusts every earlier price, so old rows can
+        no longer be mixed with new ones.
+        
+        Args:
+            existing: Previously saved historical data
+            data: Newly downloaded historical data
+            
+        Raises:
+            StaleHistoryError: If an overlapping price differs beyond ADJUSTMENT_TOLERANCE
+        """
+        column = next((c for c in ('Close',) + PRICE_COLUMNS
+                       if c in existing.columns and c in data.columns), None)
+        overlap = existing.index.intersection(data.index)
+        if column is None or overlap.empty:
+            return
+        
+        saved = existing.loc[overlap, column].astype('float64')
+        fresh = data.loc[overlap, column].astype('float64')
+        drift = (saved - fresh).abs() > ADJUSTMENT_TOLERANCE * fresh.abs()
+        if drift.any():
+            raise StaleHistoryError(
+                f"{column} on {drift[drift].index[0]:%Y-%m-%d} changed from "
+                f"{saved[drift].iloc[0]:.4f} to {fresh[drift].iloc[0]:.4f}"
+            )
+    
+    def _downcast(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Narrow OHLCV dtypes before serialization: prices to float32 and Volume
+        to int32. Volume keeps its dtype if it has gaps or exceeds the int32 range.
+        
+        Args:
+            data: Historical data to downcast
+            
+        Returns:
+            DataFrame with narrowed column dtypes
+        """
+        dtypes = {column: 'float32' for column in PRICE_COLUMNS if column in data.columns}
+        
+        if 'Volume' in data.columns:
+            volume = data['Volume']
+            if volume.notna().all() and volume.abs().max() <= INT32_MAX:
+                dtypes['Volume'] = 'int32'
+        
+        return data.astype(dtypes)
+    
+    def _write_dataset(self, frames: Dict[str, pd.DataFrame]) -> None:
+        """
+        Write frames into the Hive-partitioned Parquet dataset, one partition per symbol.
+        Partitions of symbols not in frames are left untouched.
+        
+        Args:
+            frames: Historical data keyed by symbol
+        """
+        # Long format: Date index plus a symbol column used as the partition key
+        long = pd.concat(frames, names=['symbol']).reset_index(level='symbol')
+        
+        ds.write_dataset(
+            pa.Table.from_pandas(long, preserve_index=True),
+            self.dataset_path,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("symbol", pa.string())]), flavor="hive"),
+            basename_template="part-{i}.parquet",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+    
+    def _output_filename(self, symbol: str, prefix: str) -> str:
+        """
+        Build the output filename for a stock or index symbol.
+        
+        Args:
+            symbol: Stock ticker symbol (e.g., 'RELIANCE.NS') or index symbol
+            prefix: Output directory including the trailing path separator
+            
+        Returns:
+            Full output path including the format's file extension
+        """
+        if self.output_format == 'dataset':
+            # Matches the URI-encoded Hive partition directory pyarrow writes
+            partition = "symbol=" + quote(symbol, safe='')
+            return os.path.join(self.dataset_path, partition, "part-0.parquet")
+        
+        if symbol in MARKET_INDICES:
+            stem = f"{MARKET_INDICES[symbol]}_index"
+        else:
+            # Drop the exchange suffix only inside that exchange's own directory,
+            # so TCS.NS and TCS.BO saved to one directory never share a file
+            name, dot, suffix = symbol.partition('.')
+            stem = name if self._exchange_prefixes.get(dot + suffix) == prefix else symbol
+        return prefix + stem + self._ext
+    
+    def _read_frame(self, filename: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read a previously saved file back into a Date-indexed DataFrame.
+        
+        Args:
+            filename: Path of a file written by _write_frame
+            columns: Optional subset of data columns to load
+            
+        Returns:
+            DataFrame indexed by Date
+        """
+        if self.output_format in ('parquet', 'dataset'):
+            return pd.read_parquet(filename, columns=columns)
+        
+        if self.output_format == 'feather':
+            data = pd.read_feather(filename, columns=None if columns is None else ['Date'] + columns)
+            return data.set_index(data.columns[0])
+        
+        data = pd.read_csv(filename, index_col=0, parse_dates=True)
+        return data if columns is None else data[columns]
+    
+    def _resume_start(self, filename: str, start_date: datetime,
+                      end_date: datetime) -> Optional[datetime]:
+        """
+        Work out where an incremental download for an existing file should start.
+        
+        Args:
+            filename: Output path for the symbol
+            start_date: Requested start date for historical data
+            end_date: Requested end date for historical data
+            
+        Returns:
+            Date to start downloading from, or None if the file is already up to date
+        """
+        if not os.path.exists(filename):
+            return start_date
+        
+        try:
+            # Only the index is needed for the freshness check
+            last_date = self._read_frame(filename, columns=[]).index.max()
+        except Exception as e:
+            logger.warning("Failed to read existing %s: %s. Downloading full range.", filename, e)
+            return start_date
+        
+        if pd.isna(last_date):
+            return start_date
+        
+        # yfinance returns today's bar (partial while the market is open), so only a
+        # file that already has a row for the end date is current; an older last row
+        # is re-fetched on the next run and replaced with the settled values
+        if last_date >= pd.Timestamp(end_date).normalize():
+            return None
+        
+        # Re-fetch from the last saved row; overlapping rows are replaced on save
+        return last_date.to_pydatetime()
+    
+    def download_market_indices(self, start_date: datetime, end_date: datetime) -> None:
+        """
+        Download historical data for major Indian market indices.
+        
+        Args:
+            start_date: Start date for historical data
+            end_date: End date for historical data
+        """
+        logger.info("Starting download of market indices")
+        
+        with ThreadPoolExecutor(max_workers=min(len(MARKET_INDICES), self.max_workers)) as executor:
+            futures = {
+                executor.submit(self._download_index, symbol, name, start_date, end_date): name
+                for symbol, name in MARKET_INDICES.items()
+            }
+            for future in as_completed(futures):
+                future.result()
+    
+    def _download_index(self, symbol: str, name: str, start_date: datetime,
+                        end_date: datetime, replace: bool = False) -> bool:
+        """
+        Download historical data for a single market index.
+        
+        Args:
+            symbol: Yahoo Finance index symbol (e.g., '^NSEI')
+            name: Display name used in log messages
+            start_date: Start date for historical data
+            end_date: End date for historical data
+            replace: Download the whole range and overwrite any saved history
+            
+        Returns:
+            True if download successful, False otherwise
+        """
+        try:
+            resume = start_date if replace else self._resume_start(
+                self._output_filename(symbol, self._base_prefix), start_date, end_date
+            )
+            if resume is None:
+                logger.info("%s index is up-to-date, skipping", name)
+                return True
+            
+            logger.info("Downloading %s index data", name)
+            self._warm_session()
+            self._throttle()
+            data = yf.download(symbol, start=resume, end=end_date, progress=False,
+                               session=self._session)
+            
+            if not data.empty:
+                data = self._flatten_columns(data)
+                try:
+                    return self._save_data(data, symbol, self._base_prefix, replace)
+                except StaleHistoryError as e:
+                    logger.warning("Cannot extend saved history for %s: %s. Replacing it.", symbol, e)
+                    if resume == start_date:
+                        return self._save_data(data, symbol, self._base_prefix, replace=True)
+                    return self._download_index(symbol, name, start_date, end_date, replace=True)
+            else:
+                logger.warning("No data available for %s", name)
+                return False
+                
+        except Exception as e:
+            logger.error("Failed to download %s index: %s", name, e)
+            return False
     
     def run_full_download(self, years: int = 10) -> Dict[str, any]:
         """
         Execute complete download workflow for all indices and stocks.
         
+        Indices, Nifty 50 and Sensex 30 symbols are fetched together in one
+        batched request and routed to their directories by exchange suffix.
+        
         Args:
             years: Number of years of historical data to download
             
@@ -241,47 +1162,33 @@ class StockDataDownloader:
         logger.info("=" * 70)
         logger.info("INDIAN STOCK MARKET DATA DOWNLOADER - FULL EXECUTION")
         logger.info("=" * 70)
-        logger.info(f"Date range: {start_date.date()} to {end_date.date()}")
-        logger.info(f"Data path: {os.path.abspath(self.base_path)}")
-        
-        stats = {
-            'start_date': start_date,
-            'end_date': end_date,
-            'indices_downloaded': 0,
-            'nifty_success': 0,
-            'nifty_total': 0,
-            'sensex_success': 0,
-            'sensex_total': 0
-        }
+        logger.info("Date range: %s to %s", start_date.date(), end_date.date())
+        logger.info("Data path: %s", os.path.abspath(self.base_path))
         
-        # Step 1: Download market indices
+        # Step 1: Resolve index constituents (order-preserving dedupe)
         logger.info("\n" + "=" * 70)
-        logger.info("PHASE 1: Downloading Market Indices")
+        logger.info("PHASE 1: Resolving Index Constituents")
         logger.info("=" * 70)
-        self.download_market_indices(start_date, end_date)
-        stats['indices_downloaded'] = 3
+        indices = list(MARKET_INDICES)
+        nifty_stocks = list(dict.fromkeys(self.get_nifty50_stocks()))
+        sensex_stocks = list(dict.fromkeys(self.get_sensex30_stocks()))
+        all_symbols = list(dict.fromkeys(indices + nifty_stocks + sensex_stocks))
         
-        # Step 2: Download Nifty 50 constituent stocks
+        # Step 2: Download every symbol in a single batch
         logger.info("\n" + "=" * 70)
-        logger.info("PHASE 2: Downloading Nifty 50 Stocks")
+        logger.info("PHASE 2: Downloading %d Symbols", len(all_symbols))
         logger.info("=" * 70)
-        nifty_stocks = self.get_nifty50_stocks()
-        nifty_success, nifty_total = self.bulk_download_stocks(
-            nifty_stocks, self.nifty_path, start_date, end_date
-        )
-        stats['nifty_success'] = nifty_success
-        stats['nifty_total'] = nifty_total
+        results = self._download_batch(all_symbols, start_date, end_date, self._route_prefix)
         
-        # Step 3: Download Sensex 30 constituent stocks
-        logger.info("\n" + "=" * 70)
-        logger.info("PHASE 3: Downloading Sensex 30 Stocks")
-        logger.info("=" * 70)
-        sensex_stocks = self.get_sensex30_stocks()
-        sensex_success, sensex_total = self.bulk_download_stocks(
-            sensex_stocks, self.sensex_path, start_date, end_date
-        )
-        stats['sensex_success'] = sensex_success
-        stats['sensex_total'] = sensex_total
+        stats = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'indices_downloaded': sum(results.get(s, False) for s in indices),
+            'nifty_success': sum(results.get(s, False) for s in nifty_stocks),
+            'nifty_total': len(nifty_stocks),
+            'sensex_success': sum(results.get(s, False) for s in sensex_stocks),
+            'sensex_total': len(sensex_stocks)
+        }
         
         # Display final summary
         self._print_summary(stats)
@@ -298,14 +1205,17 @@ class StockDataDownloader:
         logger.info("\n" + "=" * 70)
         logger.info("DOWNLOAD SUMMARY REPORT")
         logger.info("=" * 70)
-        logger.info(f"Date Range: {stats['start_date'].date()} to {stats['end_date'].date()}")
-        logger.info(f"Indices Downloaded: {stats['indices_downloaded']}")
-        logger.info(f"Nifty 50: {stats['nifty_success']}/{stats['nifty_total']} stocks")
-        logger.info(f"Sensex 30: {stats['sensex_success']}/{stats['sensex_total']} stocks")
+        logger.info("Date Range: %s to %s", stats['start_date'].date(), stats['end_date'].date())
+        logger.info("Indices Downloaded: %d", stats['indices_downloaded'])
+        logger.info("Nifty 50: %d/%d stocks", stats['nifty_success'], stats['nifty_total'])
+        logger.info("Sensex 30: %d/%d stocks", stats['sensex_success'], stats['sensex_total'])
         logger.info("\nData Location:")
-        logger.info(f"  - Indices: {self.base_path}/")
-        logger.info(f"  - Nifty 50: {self.nifty_path}/")
-        logger.info(f"  - Sensex 30: {self.sensex_path}/")
+        if self.output_format == 'dataset':
+            logger.info("  - Dataset: %s/", self.dataset_path)
+        else:
+            logger.info("  - Indices: %s/", self.base_path)
+            logger.info("  - Nifty 50: %s/", self.nifty_path)
+            logger.info("  - Sensex 30: %s/", self.sensex_path)
         logger.info("=" * 70)
 
 
@@ -335,7 +1245,7 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logger.warning("\nDownload interrupted by user")
     except Exception as e:
-        logger.error(f"Critical error during execution: {str(e)}", exc_info=True)
+        logger.error("Critical error during execution: %s", e, exc_info=True)
         
         
         